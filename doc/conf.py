@@ -17,10 +17,14 @@ version = "1.0"
 release = "1.0"
 
 rst_epilog = """
+.. |hyperscan| replace:: ``hyperscan``
+.. |pyahocorasick| replace:: ``pyahocorasick``
 .. |pyyaml| replace:: ``PyYaml``
 .. |re2| replace:: ``google-re2``
 .. |regex| replace:: ``regex``
 
+.. _hyperscan: https://pypi.org/project/hyperscan
+.. _pyahocorasick: https://pypi.org/project/pyahocorasick
 .. _pyyaml: https://pyyaml.org
 .. _re2: https://pypi.org/project/google-re2
 .. _regex: https://pypi.org/project/ua-parser-rs
@@ -36,16 +36,21 @@ __all__ = [
     "load_lazy_builtins",
     "parse",
     "parse_device",
+    "parse_many",
     "parse_os",
     "parse_user_agent",
 ]
 
-import importlib.util
+import functools
+import importlib
+import itertools
+import os
 import threading
-from typing import Callable, Optional, cast
+import weakref
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar, cast
 
 from .basic import Resolver as BasicResolver
-from .caching import CachingResolver, S3Fifo as Cache
+from .caching import CachingResolver, Sieve as Cache
 from .core import (
     DefaultedResult,
     Device,
@@ -60,23 +65,58 @@ from .core import (
 from .loaders import load_builtins, load_lazy_builtins
 from .utils import IS_GRAAL
 
+# enum member lookups are surprisingly costly, bind the domains used
+# by the parser and the hot helpers once
+_D_ALL = Domain.ALL
+_D_UA = Domain.USER_AGENT
+_D_OS = Domain.OS
+_D_DEV = Domain.DEVICE
+
+# number of user agents `Parser.parse_many` resolves at once, if the
+# resolver is a caching resolver
+_BATCH_SIZE = 256
+_DEFAULT_CACHE_SIZE = int(os.environ.get("UA_PARSER_CACHE_SIZE", "4096"))
+
 _ResolverCtor = Callable[[Matchers], Resolver]
-Re2Resolver: Optional[_ResolverCtor] = None
-if importlib.util.find_spec("re2"):
-    from .re2 import Resolver as Re2Resolver
-RegexResolver: Optional[_ResolverCtor] = None
-if importlib.util.find_spec("ua_parser_rs"):
-    from .regex import Resolver as RegexResolver
-BestAvailableResolver: _ResolverCtor = next(
-    filter(
-        None,
-        (
-            RegexResolver,
-            Re2Resolver,
-            lambda m: CachingResolver(BasicResolver(m), Cache(2000)),
-        ),
-    )
-)
+
+# The optional resolvers (in order of preference) are only imported
+# when first needed, as they (and their dependencies) are relatively
+# costly to load. The names are resolved through the module's
+# `__getattr__`.
+_OPTIONAL_RESOLVERS = {
+    "RegexResolver": ".regex",
+    "HyperscanResolver": ".hyperscan",
+    "Re2Resolver": ".re2",
+    "AhoCorasickResolver": ".ahocorasick",
+}
+RegexResolver: Optional[_ResolverCtor]
+HyperscanResolver: Optional[_ResolverCtor]
+Re2Resolver: Optional[_ResolverCtor]
+AhoCorasickResolver: Optional[_ResolverCtor]
+BestAvailableResolver: _ResolverCtor
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_resolver(name: str) -> Optional[_ResolverCtor]:
+    try:
+        module = importlib.import_module(_OPTIONAL_RESOLVERS[name], __name__)
+    except ImportError:
+        return None
+    return cast(_ResolverCtor, module.Resolver)
+
+
+def _default_resolver(m: Matchers) -> Resolver:
+    if (ac := _optional_resolver("AhoCorasickResolver")) is not None:
+        return CachingResolver(ac(m), Cache(_DEFAULT_CACHE_SIZE))
+    return CachingResolver(BasicResolver(m), Cache(_DEFAULT_CACHE_SIZE))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_best_resolver_ctor() -> _ResolverCtor:
+    for name in ("RegexResolver", "HyperscanResolver", "Re2Resolver"):
+        if (r := _optional_resolver(name)) is not None:
+            return r
+    return _default_resolver
 
 
 VERSION = (1, 0, 1)
@@ -88,6 +128,8 @@ class Parser:
 
     """
 
+    __slots__ = ("__weakref__", "resolver")
+
     @classmethod
     def from_matchers(cls, m: Matchers, /) -> Parser:
         """from_matchers(Matchers) -> Parser
@@ -97,7 +139,7 @@ class Parser:
         stack.
 
         """
-        return cls(BestAvailableResolver(m))
+        return cls(_get_best_resolver_ctor()(m))
 
     def __init__(self, resolver: Resolver) -> None:
         self.resolver = resolver
@@ -111,19 +153,35 @@ class Parser:
 
     def parse(self: Resolver, ua: str) -> Result:
         """Convenience method for parsing all domains."""
-        return self(ua, Domain.ALL).complete()
+        return self(ua, _D_ALL).complete()
+
+    def parse_many(self: Resolver, uas: Iterable[str]) -> Iterator[Result]:
+        """Convenience method for parsing all domains of every user
+        agent in ``uas``, lazily yields the results in order.
+        """
+        # skip the parser's own indirection for the entire batch
+        resolve = getattr(self, "resolver", self)
+        if not isinstance(resolve, CachingResolver):
+            for ua in uas:
+                yield resolve(ua, _D_ALL).complete()
+            return
+
+        it = iter(uas)
+        while batch := list(itertools.islice(it, _BATCH_SIZE)):
+            for r in resolve.resolve_many(batch, _D_ALL):
+                yield r.complete()
 
     def parse_user_agent(self: Resolver, ua: str) -> Optional[UserAgent]:
         """Convenience method for parsing the :class:`UserAgent` domain."""
-        return self(ua, Domain.USER_AGENT).user_agent
+        return self(ua, _D_UA).user_agent
 
     def parse_os(self: Resolver, ua: str) -> Optional[OS]:
         """Convenience method for parsing the :class:`OS` domain."""
-        return self(ua, Domain.OS).os
+        return self(ua, _D_OS).os
 
     def parse_device(self: Resolver, ua: str) -> Optional[Device]:
         """Convenience method for parsing the :class:`Device` domain."""
-        return self(ua, Domain.DEVICE).device
+        return self(ua, _D_DEV).device
 
 
 parser: Parser
@@ -137,27 +195,112 @@ initialisation, rather than pay for it at first call.
 """
 
 _lazy_globals_lock = threading.Lock()
+# the parser `__getattr__` built, as opposed to one set by the user
+_default_parser: Optional[weakref.ReferenceType[Parser]] = None
+
 
+def __getattr__(name: str) -> Any:
+    global parser, _default_parser
+    if name in _OPTIONAL_RESOLVERS:
+        return _optional_resolver(name)
+    if name == "BestAvailableResolver":
+        return _get_best_resolver_ctor()
+    if name != "parser":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if p := globals().get("parser"):
+        return cast(Parser, p)
 
-def __getattr__(name: str) -> Parser:
-    global parser
     with _lazy_globals_lock:
-        if name == "parser":
-            # if two threads access `ua_parser.parser` before it's
-            # initialised, the second one will wait until the first
-            # one's finished by which time the parser global should be
-            # set and can be returned with no extra work
-            if p := globals().get("parser"):
-                return cast(Parser, p)
+        # if two threads access `ua_parser.parser` before it's
+        # initialised, the second one will wait until the first one's
+        # finished by which time the parser global should be set and
+        # can be returned with no extra work
+        if p := globals().get("parser"):
+            return cast(Parser, p)
+
+        if (
+            _get_best_resolver_ctor() is not _default_resolver
+            or _optional_resolver("AhoCorasickResolver")
+            or IS_GRAAL
+        ):
+            matchers = load_lazy_builtins()
+        else:
+            matchers = load_builtins()
+        parser = Parser.from_matchers(matchers)
+        _default_parser = weakref.ref(parser)
+        # the memoized results belong to the previous default parser
+        _reset_cache()
+        return parser
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+if os.environ.get("UA_PARSER_HELPERS_CACHE") == "0":
+
+    def _memoize(f: F) -> F:
+        return f
+
+else:
+
+    def _memoize(f: F) -> F:
+        return cast(F, functools.lru_cache(maxsize=_DEFAULT_CACHE_SIZE)(f))
+
+
+# The helpers results are memoized on top of whatever caching the
+# default parser does, which skips the resolver entirely on repeated
+# user agents. Only the parser built by `__getattr__` is memoized, and
+# the memos are reset whenever it's rebuilt: they don't hold onto the
+# parser, and a parser set by the user is used as configured.
+@_memoize
+def _parse(ua: str) -> Result:
+    return parser.resolver(ua, _D_ALL).complete()
+
+
+@_memoize
+def _parse_user_agent(ua: str) -> Optional[UserAgent]:
+    return parser.resolver(ua, _D_UA).user_agent
 
-            if RegexResolver or Re2Resolver or IS_GRAAL:
-                matchers = load_lazy_builtins()
-            else:
-                matchers = load_builtins()
-            parser = Parser.from_matchers(matchers)
-            return parser
 
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+@_memoize
+def _parse_os(ua: str) -> Optional[OS]:
+    return parser.resolver(ua, _D_OS).os
+
+
+@_memoize
+def _parse_device(ua: str) -> Optional[Device]:
+    return parser.resolver(ua, _D_DEV).device
+
+
+def _is_default(p: Parser) -> bool:
+    return _default_parser is not None and p is _default_parser()
+
+
+def _reset_cache() -> None:
+    """Clears the global helpers' memoization."""
+    for f in (_parse, _parse_user_agent, _parse_os, _parse_device):
+        if cache_clear := getattr(f, "cache_clear", None):
+            cache_clear()
+
+
+def _after_fork_in_child() -> None:
+    """Gives forked children an empty cache (and a fresh lock) for the
+    default parser, rather than have every child copy the parent's
+    cache pages on its first parse. The matchers are left shared.
+
+    A parser set by the user is left alone, its cache may have been
+    warmed on purpose.
+    """
+    p = _default_parser() if _default_parser else None
+    if p is not None and p is cast(Optional[Parser], globals().get("parser")):
+        r = p.resolver
+        if isinstance(r, CachingResolver) and isinstance(r.cache, Cache):
+            r.cache = Cache(r.cache.maxsize)
+    _reset_cache()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 
 def parse(ua: str) -> Result:
@@ -172,35 +315,78 @@ def parse(ua: str) -> Result:
     Even in the best case, prefer the domain-specific helpers if
     you're not going to use *all* of them.
     """
-    # import required to trigger __getattr__ and initialise the
-    # parser, a `global` access fails to and we get a NameError
-    from . import parser
+    # the global is unset until the parser is initialised, in which
+    # case a global access fails with a NameError and we need to go
+    # through __getattr__ explicitly
+    try:
+        p = parser
+    except NameError:
+        p = __getattr__("parser")
 
-    return parser(ua, Domain.ALL).complete()
+    if _is_default(p):
+        return _parse(ua)
+    return p.resolver(ua, _D_ALL).complete()
 
 
 def parse_user_agent(ua: str) -> Optional[UserAgent]:
     """Parses the :class:`browser <.UserAgent>` information using the
     :data:`global parser <parser>`.
     """
-    from . import parser
+    try:
+        p = parser
+    except NameError:
+        p = __getattr__("parser")
 
-    return parser(ua, Domain.USER_AGENT).user_agent
+    if _is_default(p):
+        return _parse_user_agent(ua)
+    return p.resolver(ua, _D_UA).user_agent
 
 
 def parse_os(ua: str) -> Optional[OS]:
     """Parses the :class:`.OS` information using the :data:`global parser
     <parser>`.
     """
-    from . import parser
+    try:
+        p = parser
+    except NameError:
+        p = __getattr__("parser")
 
-    return parser(ua, Domain.OS).os
+    if _is_default(p):
+        return _parse_os(ua)
+    return p.resolver(ua, _D_OS).os
 
 
 def parse_device(ua: str) -> Optional[Device]:
     """Parses the :class:`.Device` information using the :data:`global
     parser <parser>`.
     """
-    from . import parser
+    try:
+        p = parser
+    except NameError:
+        p = __getattr__("parser")
+
+    if _is_default(p):
+        return _parse_device(ua)
+    return p.resolver(ua, _D_DEV).device
+
+
+def parse_many(uas: Iterable[str]) -> Iterator[Result]:
+    """Parses all the information of every user agent in ``uas`` using
+    the :data:`global parser <parser>`, lazily yields the results in
+    order.
+
+    Equivalent to calling :func:`parse` on each user agent, but avoids
+    the per-call overhead.
+    """
+    try:
+        p = parser
+    except NameError:
+        p = __getattr__("parser")
+
+    if _is_default(p):
+        return map(_parse, uas)
+    return p.parse_many(uas)
+
 
-    return parser(ua, Domain.DEVICE).device
+if os.environ.get("UA_PARSER_EAGER_INIT") == "1":
+    __getattr__("parser")
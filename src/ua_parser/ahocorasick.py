@@ -0,0 +1,184 @@
+__all__ = ["Resolver"]
+
+import re
+from collections import Counter
+from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+import ahocorasick  # type: ignore
+
+from .core import (
+    Device,
+    Domain,
+    Matcher,
+    Matchers,
+    OS,
+    PartialResult,
+    UserAgent,
+)
+from .utils import extract_literals
+
+T = TypeVar("T")
+_ALL = Domain.ALL
+_UA = Domain.USER_AGENT
+_OS = Domain.OS
+_DEV = Domain.DEVICE
+
+
+class Prefilter(Generic[T]):
+    """Indexes a set of matchers by the literals they require (see
+    :func:`~ua_parser.utils.extract_literals`), and uses
+    ``pyahocorasick`` to find the candidate matchers for an input
+    string in a single pass.
+
+    Each matcher is indexed by a single set of alternatives, the
+    rarest amongst the matchers (literals which many matchers require
+    are also likely to be very common in user agents e.g. ``Build``)
+    ignoring single characters.
+
+    Matchers without any required literal always have to be checked.
+    """
+
+    def __init__(self, matchers: List[Matcher[T]]) -> None:
+        self.matchers = matchers
+        self.always: Set[int] = set()
+        # the flags may also be set inline, so the case sensitivity
+        # comes from the parsed pattern
+        factors = [extract_literals(m.regex, m.flags) for m in matchers]
+        frequencies = Counter(
+            literal for _, fs in factors for f in fs for literal in set(f)
+        )
+
+        def rarity(f: Tuple[str, ...]) -> Tuple[int, int, int]:
+            length = min(map(len, f))
+            return (min(length, 2), -max(map(frequencies.__getitem__, f)), length)
+
+        index: Dict[str, List[int]] = {}
+        iindex: Dict[str, List[int]] = {}
+        for i, (flags, fs) in enumerate(factors):
+            if fs:
+                idx = iindex if flags & re.IGNORECASE else index
+                for literal in max(fs, key=rarity):
+                    idx.setdefault(literal, []).append(i)
+            else:
+                self.always.add(i)
+
+        self.index = index
+        self.iindex = iindex
+        self.icase_always = self.always.union(*iindex.values())
+        self.automaton = _automaton(index)
+        self.iautomaton = _automaton(iindex)
+
+    def __call__(self, ua: str) -> Optional[T]:
+        candidates = set(self.always)
+        if self.automaton:
+            for _, indices in self.automaton.iter(ua):
+                candidates.update(indices)
+        if self.iautomaton:
+            # non-ascii characters may case-fold to ascii (e.g. the
+            # kelvin sign), so the literals can't be trusted
+            if ua.isascii():
+                for _, indices in self.iautomaton.iter(ua.lower()):
+                    candidates.update(indices)
+            else:
+                candidates.update(self.icase_always)
+
+        return self.first(candidates, ua)
+
+    def first(self, candidates: Iterable[int], ua: str) -> Optional[T]:
+        """Returns the result of the first of the ``candidates``
+        matchers which matches ``ua``.
+        """
+        matchers = self.matchers
+        for i in sorted(candidates):
+            if r := matchers[i](ua):
+                return r
+        return None
+
+
+def _automaton(index: Dict[str, Any]) -> Optional[ahocorasick.Automaton]:
+    if not index:
+        return None
+    a = ahocorasick.Automaton()
+    for literal, indices in index.items():
+        a.add_word(literal, tuple(indices))
+    a.make_automaton()
+    return a
+
+
+def _fused(
+    indexes: Iterable[Dict[str, List[int]]],
+) -> Optional[ahocorasick.Automaton]:
+    """Builds an automaton over the literals of every domain, whose
+    values are the tuple of the indices of each domain.
+    """
+    index: Dict[str, List[Tuple[int, ...]]] = {}
+    for d, idx in enumerate(indexes):
+        for literal, indices in idx.items():
+            index.setdefault(literal, [(), (), ()])[d] = tuple(indices)
+    return _automaton(index)
+
+
+class Resolver:
+    """A pure-python resolver which prefilters matchers by the literal
+    substrings their regexes require, only running the regexes which
+    may actually match the user agent.
+
+    Much faster than :class:`~ua_parser.basic.Resolver` on cache misses.
+    """
+
+    user_agent: Prefilter[UserAgent]
+    os: Prefilter[OS]
+    device: Prefilter[Device]
+
+    def __init__(self, matchers: Matchers) -> None:
+        ua, os, dev = matchers
+        self.user_agent = Prefilter(ua)
+        self.os = Prefilter(os)
+        self.device = Prefilter(dev)
+
+        # when resolving every domain, scan the user agent once for
+        # all of them
+        prefilters = (self.user_agent, self.os, self.device)
+        self.automaton = _fused(p.index for p in prefilters)
+        self.iautomaton = _fused(p.iindex for p in prefilters)
+
+    def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
+        if domains is _ALL:
+            return self._resolve_all(ua)
+
+        return PartialResult(
+            domains=domains,
+            string=ua,
+            user_agent=self.user_agent(ua) if _UA in domains else None,
+            os=self.os(ua) if _OS in domains else None,
+            device=self.device(ua) if _DEV in domains else None,
+        )
+
+    def _resolve_all(self, ua: str) -> PartialResult:
+        user_agent, os, device = self.user_agent, self.os, self.device
+        uas = set(user_agent.always)
+        oss = set(os.always)
+        devices = set(device.always)
+        if self.automaton:
+            for _, (u, o, d) in self.automaton.iter(ua):
+                uas.update(u)
+                oss.update(o)
+                devices.update(d)
+        if self.iautomaton:
+            if ua.isascii():
+                for _, (u, o, d) in self.iautomaton.iter(ua.lower()):
+                    uas.update(u)
+                    oss.update(o)
+                    devices.update(d)
+            else:
+                uas.update(user_agent.icase_always)
+                oss.update(os.icase_always)
+                devices.update(device.icase_always)
+
+        return PartialResult(
+            domains=_ALL,
+            string=ua,
+            user_agent=user_agent.first(uas, ua),
+            os=os.first(oss, ua),
+            device=device.first(devices, ua),
+        )
@@ -1,9 +1,8 @@
 __all__ = ["Resolver"]
 
 import re
-from itertools import chain
-from operator import methodcaller
-from typing import Any, List
+from itertools import chain, compress, repeat
+from typing import Any, List, Optional, Pattern, TypeVar
 
 from .core import (
     Device,
@@ -14,7 +13,14 @@ from .core import (
     PartialResult,
     UserAgent,
 )
-from .utils import IS_GRAAL, fa_simplifier
+from .utils import IS_GRAAL, fa_simplifier, strip_captures
+
+T = TypeVar("T")
+_search = re.Pattern.search
+_ALL = Domain.ALL
+_UA = Domain.USER_AGENT
+_OS = Domain.OS
+_DEV = Domain.DEVICE
 
 
 class Resolver:
@@ -22,11 +28,18 @@ class Resolver:
     regular expressions in sequence for each domain, and returning a
     result when one matches.
 
+    The regexes are all tried from C (via :func:`map`) and without
+    their capturing groups, only the matcher which hit is invoked in
+    order to extract the data.
+
     """
 
     user_agent_matchers: List[Matcher[UserAgent]]
+    user_agent_patterns: List[Pattern[str]]
     os_matchers: List[Matcher[OS]]
+    os_patterns: List[Pattern[str]]
     device_matchers: List[Matcher[Device]]
+    device_patterns: List[Pattern[str]]
 
     def __init__(
         self,
@@ -52,33 +65,56 @@ class Resolver:
                 for matcher in chain.from_iterable(matchers):
                     matcher.regex = fa_simplifier(matcher.pattern.pattern)
 
+        self.user_agent_patterns = _patterns(self.user_agent_matchers)
+        self.os_patterns = _patterns(self.os_matchers)
+        self.device_patterns = _patterns(self.device_matchers)
+
     def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
-        parse = methodcaller("__call__", ua)
+        every = domains is _ALL
         return PartialResult(
             domains=domains,
             string=ua,
             user_agent=(
-                next(
-                    filter(None, map(parse, self.user_agent_matchers)),
-                    None,
-                )
-                if Domain.USER_AGENT in domains
+                _first(self.user_agent_matchers, self.user_agent_patterns, ua)
+                if every or _UA in domains
                 else None
             ),
             os=(
-                next(
-                    filter(None, map(parse, self.os_matchers)),
-                    None,
-                )
-                if Domain.OS in domains
+                _first(self.os_matchers, self.os_patterns, ua)
+                if every or _OS in domains
                 else None
             ),
             device=(
-                next(
-                    filter(None, map(parse, self.device_matchers)),
-                    None,
-                )
-                if Domain.DEVICE in domains
+                _first(self.device_matchers, self.device_patterns, ua)
+                if every or _DEV in domains
                 else None
             ),
         )
+
+
+def _patterns(matchers: List[Matcher[T]]) -> List[Pattern[str]]:
+    patterns = []
+    for m in matchers:
+        try:
+            patterns.append(_compile(strip_captures(m.regex), m.flags))
+        except re.error:  # backreferences
+            patterns.append(_compile(m.regex, m.flags))
+    return patterns
+
+
+def _compile(regex: str, flags: int) -> Pattern[str]:
+    try:
+        return re.compile(regex, flags | re.ASCII)
+    except ValueError:  # explicitly unicode, inline or via the flags
+        return re.compile(regex, flags)
+
+
+def _first(
+    matchers: List[Matcher[T]], patterns: List[Pattern[str]], ua: str
+) -> Optional[T]:
+    # the scan only finds candidates, a matcher may still reject the
+    # user agent in which case the scan resumes
+    for m in compress(matchers, map(_search, patterns, repeat(ua))):
+        if r := m(ua):
+            return r
+    return None
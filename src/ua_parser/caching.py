@@ -5,18 +5,26 @@ import dataclasses
 import threading
 from collections import OrderedDict, deque
 from contextvars import ContextVar
+from operator import attrgetter
 from typing import (
+    Any,
     Callable,
     Deque,
     Dict,
+    Iterable,
+    List,
     Optional,
     Protocol,
-    Union,
+    Tuple,
+    TypeVar,
+    runtime_checkable,
 )
+from weakref import WeakValueDictionary
 
-from .core import Domain, PartialResult, Resolver
+from .core import Device, Domain, OS, PartialResult, Resolver, UserAgent
 
 __all__ = [
+    "BatchCache",
     "Cache",
     "CachingResolver",
     "Lru",
@@ -24,6 +32,27 @@ __all__ = [
     "Sieve",
 ]
 
+_ALL = Domain.ALL
+
+T = TypeVar("T")
+
+# the number of distinct domain values is tiny compared to the number
+# of distinct user agents, so cached results share them
+_interned: WeakValueDictionary[Tuple[Any, ...], Any] = WeakValueDictionary()
+_fields: Dict[type, Callable[[Any], Tuple[Any, ...]]] = {
+    cls: attrgetter(*(f.name for f in dataclasses.fields(cls)))
+    for cls in (UserAgent, OS, Device)
+}
+
+
+def _intern(v: Optional[T]) -> Optional[T]:
+    # only the exact domain classes are interned, a subclass may have
+    # additional state or a different notion of equality
+    if v is None or (fields := _fields.get(type(v))) is None:
+        return v
+    r: T = _interned.setdefault((type(v), fields(v)), v)
+    return r
+
 
 class Cache(Protocol):
     """Cache()
@@ -44,6 +73,28 @@ class Cache(Protocol):
         ...
 
 
+@runtime_checkable
+class BatchCache(Cache, Protocol):
+    """BatchCache()
+
+    Optional extension of the :class:`Cache` protocol for caches
+    supporting bulk operations, which
+    :meth:`CachingResolver.resolve_many` uses when available.
+    """
+
+    @abc.abstractmethod
+    def get_many(self, keys: Iterable[str]) -> List[Optional[PartialResult]]:
+        """Returns the partial result (if any) for each of ``keys``, in
+        order.
+        """
+        ...
+
+    @abc.abstractmethod
+    def set_many(self, items: Iterable[Tuple[str, PartialResult]]) -> None:
+        """Adds or replaces every ``(key, value)`` pair of ``items``."""
+        ...
+
+
 class Lru:
     """Cache following a least-recently used replacement policy: when
     there is no more room in the cache, whichever entry was last seen
@@ -64,16 +115,35 @@ class Lru:
 
     def __getitem__(self, key: str) -> Optional[PartialResult]:
         with self.lock:
-            e = self.cache.get(key)
-            if e:
-                self.cache.move_to_end(key)
-            return e
+            return self._get(key)
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[PartialResult]]:
+        """Looks up every key in ``keys`` under a single lock acquisition."""
+        with self.lock:
+            return list(map(self._get, keys))
+
+    def _get(self, key: str) -> Optional[PartialResult]:
+        e = self.cache.get(key)
+        if e:
+            self.cache.move_to_end(key)
+        return e
 
     def __setitem__(self, key: str, value: PartialResult) -> None:
         with self.lock:
-            if len(self.cache) >= self.maxsize and key not in self.cache:
-                self.cache.popitem(last=False)
-            self.cache[key] = value
+            self._set(key, value)
+
+    def set_many(self, items: Iterable[Tuple[str, PartialResult]]) -> None:
+        """Sets every ``(key, value)`` pair in ``items`` under a single
+        lock acquisition.
+        """
+        with self.lock:
+            for key, value in items:
+                self._set(key, value)
+
+    def _set(self, key: str, value: PartialResult) -> None:
+        if len(self.cache) >= self.maxsize and key not in self.cache:
+            self.cache.popitem(last=False)
+        self.cache[key] = value
 
 
 @dataclasses.dataclass
@@ -95,43 +165,64 @@ class S3Fifo:
 
     def __init__(self, maxsize: int):
         self.maxsize = maxsize
-        self.index: Dict[str, Union[CacheEntry, str]] = {}
+        self.index: Dict[str, CacheEntry] = {}
         self.small_target = max(1, int(maxsize / 10))
         self.small: Deque[CacheEntry] = deque()
         self.main_target = maxsize - self.small_target
         self.main: Deque[CacheEntry] = deque()
-        self.ghost: Deque[str] = deque()
+        # keys recently evicted from small, used as a bounded ordered
+        # set (a dict degrades when repeatedly popped from the front)
+        self.ghost: OrderedDict[str, None] = OrderedDict()
         self.lock = threading.Lock()
 
     def __getitem__(self, key: str) -> Optional[PartialResult]:
-        if (e := self.index.get(key)) and type(e) is CacheEntry:
-            # small race here, we could miss an increment
-            e.freq = min(e.freq + 1, 3)
+        if e := self.index.get(key):
+            # small race here, we could miss an increment, only write
+            # if the counter is not saturated to avoid needlessly
+            # dirtying the entry
+            if e.freq < 3:
+                e.freq += 1
             return e.value
 
         return None
 
+    def get_many(self, keys: Iterable[str]) -> List[Optional[PartialResult]]:
+        """Looks up every key in ``keys``."""
+        return list(map(self.__getitem__, keys))
+
     def __setitem__(self, key: str, r: PartialResult) -> None:
         with self.lock:
-            if (e := self.index.get(key)) and type(e) is CacheEntry:
-                e.value = r
-                return
+            self._set(key, r)
+
+    def set_many(self, items: Iterable[Tuple[str, PartialResult]]) -> None:
+        """Sets every ``(key, value)`` pair in ``items`` under a single
+        lock acquisition.
+        """
+        with self.lock:
+            for key, r in items:
+                self._set(key, r)
 
+    def _set(self, key: str, r: PartialResult) -> None:
+        if e := self.index.get(key):
+            e.value = r
+            return
+
+        if len(self.small) + len(self.main) >= self.maxsize:
+            # if main is not overcapacity, resize small
+            if len(self.main) < self.main_target:
+                self._evict_small()
+            # evict_small could have moved every entry to main, in
+            # which case we now need to evict from main
             if len(self.small) + len(self.main) >= self.maxsize:
-                # if main is not overcapacity, resize small
-                if len(self.main) < self.main_target:
-                    self._evict_small()
-                # evict_small could have moved every entry to main, in
-                # which case we now need to evict from main
-                if len(self.small) + len(self.main) >= self.maxsize:
-                    self._evict_main()
-
-            entry = CacheEntry(key, r, 0)
-            if type(self.index.get(key)) is str:
-                self.main.appendleft(entry)
-            else:
-                self.small.appendleft(entry)
-            self.index[key] = entry
+                self._evict_main()
+
+        entry = CacheEntry(key, r, 0)
+        if key in self.ghost:
+            del self.ghost[key]
+            self.main.appendleft(entry)
+        else:
+            self.small.appendleft(entry)
+        self.index[key] = entry
 
     def _evict_main(self) -> None:
         while True:
@@ -150,12 +241,10 @@ class S3Fifo:
                 e.freq = 0
                 self.main.appendleft(e)
             else:
-                g = self.index[e.key] = e.key
-                self.ghost.appendleft(g)
-                while len(self.ghost) > self.main_target:
-                    g = self.ghost.pop()
-                    if self.index.get(g) is g:
-                        del self.index[g]
+                del self.index[e.key]
+                self.ghost[e.key] = None
+                if len(self.ghost) > self.main_target:
+                    self.ghost.popitem(last=False)
                 return
 
 
@@ -180,6 +269,11 @@ class Sieve:
     Can be an interesting candidate when trying to save on memory,
     although the contained entries will generally be much larger than
     the cache itself.
+
+    Unlike the reference algorithm, an eviction only resets the visited
+    bit of a bounded number of entries (1/16th of the cache) before
+    evicting the entry under the hand, so a single insertion never
+    walks the entire cache.
     """
 
     def __init__(self, maxsize: int) -> None:
@@ -189,30 +283,52 @@ class Sieve:
         self.tail: Optional[SieveNode] = None
         self.hand: Optional[SieveNode] = None
         self.prev: Optional[SieveNode] = None
+        # bounds the number of visited entries an eviction walks
+        # over, after which the entry under the hand gets evicted
+        # regardless
+        self.scan_cap = max(32, maxsize // 16)
         self.lock = threading.Lock()
 
     def __getitem__(self, key: str) -> Optional[PartialResult]:
         if entry := self.cache.get(key):
-            entry.visited = True
+            # only write if needed to avoid needlessly dirtying the
+            # entry
+            if not entry.visited:
+                entry.visited = True
             return entry.value
 
         return None
 
+    def get_many(self, keys: Iterable[str]) -> List[Optional[PartialResult]]:
+        """Looks up every key in ``keys``."""
+        return list(map(self.__getitem__, keys))
+
     def __setitem__(self, key: str, value: PartialResult) -> None:
         with self.lock:
-            if e := self.cache.get(key):
-                e.value = value
-                return
+            self._set(key, value)
+
+    def set_many(self, items: Iterable[Tuple[str, PartialResult]]) -> None:
+        """Sets every ``(key, value)`` pair in ``items`` under a single
+        lock acquisition.
+        """
+        with self.lock:
+            for key, value in items:
+                self._set(key, value)
+
+    def _set(self, key: str, value: PartialResult) -> None:
+        if e := self.cache.get(key):
+            e.value = value
+            return
 
-            if len(self.cache) >= self.maxsize:
-                self._evict()
+        if len(self.cache) >= self.maxsize:
+            self._evict()
 
-            node = self.cache[key] = SieveNode(key, value, False, None)
-            if self.head:
-                self.head.next = node
-            self.head = node
-            if self.tail is None:
-                self.tail = node
+        node = self.cache[key] = SieveNode(key, value, False, None)
+        if self.head:
+            self.head.next = node
+        self.head = node
+        if self.tail is None:
+            self.tail = node
 
     def _evict(self) -> None:
         obj: Optional[SieveNode]
@@ -221,7 +337,9 @@ class Sieve:
         else:
             obj, pobj = self.tail, None
 
-        while obj and obj.visited:
+        scan = self.scan_cap
+        while obj and obj.visited and scan:
+            scan -= 1
             obj.visited = False
             if obj.next:
                 obj, pobj = obj.next, obj
@@ -255,6 +373,38 @@ class Local:
 
     """
 
+    def __init__(self, factory: Callable[[], Cache]) -> None:
+        self.local = threading.local()
+        self.factory = factory
+
+    @property
+    def cache(self) -> Cache:
+        c = getattr(self.local, "cache", None)
+        if c is None:
+            c = self.local.cache = self.factory()
+        return c
+
+    def __getitem__(self, key: str) -> Optional[PartialResult]:
+        c = getattr(self.local, "cache", None)
+        if c is None:
+            c = self.local.cache = self.factory()
+        return c[key]
+
+    def __setitem__(self, key: str, value: PartialResult) -> None:
+        c = getattr(self.local, "cache", None)
+        if c is None:
+            c = self.local.cache = self.factory()
+        c[key] = value
+
+
+class ContextLocal:
+    """Context local cache decorator. Works like :class:`Local` but
+    keys the caches off of a :class:`~contextvars.ContextVar` rather
+    than the current thread, so e.g. asyncio tasks each get their own
+    cache.
+
+    """
+
     def __init__(self, factory: Callable[[], Cache]) -> None:
         self.cv: ContextVar[Cache] = ContextVar("local-cache")
         self.factory = factory
@@ -293,20 +443,72 @@ class CachingResolver:
 
     def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
         entry = self.cache[ua]
-        if entry:
-            if domains in entry.domains:
-                return entry
+        # complete entries are by far the most common, and an identity
+        # check is much cheaper than flag containment
+        if entry and (entry.domains is _ALL or domains in entry.domains):
+            return entry
+
+        r = self._resolve(ua, domains, entry)
+        self.cache[ua] = r
+        return r
+
+    def resolve_many(self, uas: Iterable[str], domains: Domain) -> List[PartialResult]:
+        """Resolves every user agent in ``uas``, in order.
+
+        If the cache is a :class:`BatchCache`, the lookups and updates
+        are performed in bulk, which allows e.g. acquiring locks once
+        for the entire batch.
+        """
+        uas = list(uas)
+        cache = self.cache
+        if isinstance(cache, BatchCache):
+            entries = cache.get_many(uas)
+        else:
+            entries = [cache[ua] for ua in uas]
+
+        resolved: Dict[str, PartialResult] = {}
+        results = []
+        for ua, entry in zip(uas, entries):
+            # the user agent may have been resolved earlier in the batch
+            entry = resolved.get(ua, entry)
+            if not (entry and (entry.domains is _ALL or domains in entry.domains)):
+                entry = resolved[ua] = self._resolve(ua, domains, entry)
+            results.append(entry)
+
+        if isinstance(cache, BatchCache):
+            cache.set_many(resolved.items())
+        else:
+            for ua, r in resolved.items():
+                cache[ua] = r
+        return results
 
+    def _resolve(
+        self, ua: str, domains: Domain, entry: Optional[PartialResult]
+    ) -> PartialResult:
+        if entry:
             domains &= ~entry.domains
 
         r = self.parser(ua, domains)
+        # positional arguments are cheaper, in field order
         if entry:
-            r = PartialResult(
-                string=ua,
-                domains=entry.domains | r.domains,
-                user_agent=entry.user_agent or r.user_agent,
-                os=entry.os or r.os,
-                device=entry.device or r.device,
+            # select by flag, a field which was not resolved can be
+            # anything (and a failed resolution is falsy)
+            resolved = entry.domains
+            return PartialResult(
+                resolved | r.domains,
+                (
+                    entry.user_agent
+                    if Domain.USER_AGENT in resolved
+                    else _intern(r.user_agent)
+                ),
+                entry.os if Domain.OS in resolved else _intern(r.os),
+                entry.device if Domain.DEVICE in resolved else _intern(r.device),
+                ua,
             )
-        self.cache[ua] = r
-        return r
+        return PartialResult(
+            r.domains,
+            _intern(r.user_agent),
+            _intern(r.os),
+            _intern(r.device),
+            ua,
+        )
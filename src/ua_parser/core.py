@@ -1,7 +1,7 @@
 import abc
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Flag, auto
-from typing import Generic, List, Optional, Protocol, Tuple, TypeVar
+from typing import Any, Callable, Generic, List, Optional, Protocol, Tuple, TypeVar
 
 __all__ = [
     "OS",
@@ -16,13 +16,20 @@ __all__ = [
 ]
 
 
+def _reduce(self: Any) -> Tuple[Any, ...]:
+    # the default slots state is restored through ``setattr``, which
+    # the frozen dataclasses forbid, rebuild from the fields instead
+    return (type(self), tuple(getattr(self, f.name) for f in fields(self)))
+
+
 @dataclass(frozen=True)
 class UserAgent:
     """Browser ("user agent" aka the software responsible for the request)
     information parsed from the user agent string.
     """
 
-    __slots__ = ("family", "major", "minor", "patch", "patch_minor")
+    __slots__ = ("__weakref__", "family", "major", "minor", "patch", "patch_minor")
+    __reduce__ = _reduce
     family: str
     major: Optional[str]
     minor: Optional[str]
@@ -37,18 +44,20 @@ class UserAgent:
         patch: Optional[str] = None,
         patch_minor: Optional[str] = None,
     ) -> None:
-        object.__setattr__(self, "family", family)
-        object.__setattr__(self, "major", major)
-        object.__setattr__(self, "minor", minor)
-        object.__setattr__(self, "patch", patch)
-        object.__setattr__(self, "patch_minor", patch_minor)
+        set_family, set_major, set_minor, set_patch, set_patch_minor = _ua_setters
+        set_family(self, family)
+        set_major(self, major)
+        set_minor(self, minor)
+        set_patch(self, patch)
+        set_patch_minor(self, patch_minor)
 
 
 @dataclass(frozen=True)
 class OS:
     """OS information parsed from the user agent string."""
 
-    __slots__ = ("family", "major", "minor", "patch", "patch_minor")
+    __slots__ = ("__weakref__", "family", "major", "minor", "patch", "patch_minor")
+    __reduce__ = _reduce
     family: str
     major: Optional[str]
     minor: Optional[str]
@@ -63,18 +72,20 @@ class OS:
         patch: Optional[str] = None,
         patch_minor: Optional[str] = None,
     ) -> None:
-        object.__setattr__(self, "family", family)
-        object.__setattr__(self, "major", major)
-        object.__setattr__(self, "minor", minor)
-        object.__setattr__(self, "patch", patch)
-        object.__setattr__(self, "patch_minor", patch_minor)
+        set_family, set_major, set_minor, set_patch, set_patch_minor = _os_setters
+        set_family(self, family)
+        set_major(self, major)
+        set_minor(self, minor)
+        set_patch(self, patch)
+        set_patch_minor(self, patch_minor)
 
 
 @dataclass(frozen=True)
 class Device:
     """Device information parsed from the user agent string."""
 
-    __slots__ = ("brand", "family", "model")
+    __slots__ = ("__weakref__", "brand", "family", "model")
+    __reduce__ = _reduce
     family: str
     brand: Optional[str]
     model: Optional[str]
@@ -85,9 +96,26 @@ class Device:
         brand: Optional[str] = None,
         model: Optional[str] = None,
     ) -> None:
-        object.__setattr__(self, "family", family)
-        object.__setattr__(self, "brand", brand)
-        object.__setattr__(self, "model", model)
+        set_family, set_brand, set_model = _device_setters
+        set_family(self, family)
+        set_brand(self, brand)
+        set_model(self, model)
+
+
+def _setters(cls: type, *fields: str) -> Tuple[Callable[[Any, Any], None], ...]:
+    # calling the slot descriptors directly bypasses the frozen
+    # ``__setattr__``, and is much cheaper than ``object.__setattr__``
+    return tuple(cls.__dict__[f].__set__ for f in fields)
+
+
+_ua_setters = _setters(UserAgent, "family", "major", "minor", "patch", "patch_minor")
+_os_setters = _setters(OS, "family", "major", "minor", "patch", "patch_minor")
+_device_setters = _setters(Device, "family", "brand", "model")
+
+# domain values are immutable, so the defaults can be shared
+_DEFAULT_USER_AGENT = UserAgent()
+_DEFAULT_OS = OS()
+_DEFAULT_DEVICE = Device()
 
 
 class Domain(Flag):
@@ -105,6 +133,13 @@ class Domain(Flag):
     ALL = USER_AGENT | OS | DEVICE
 
 
+# flag members are singletons, so identity is the cheapest way to
+# check for a complete result, or for a request of every domain:
+# resolvers check ``domains is _ALL`` before falling back to flag
+# containment, which is implemented in python
+_ALL = Domain.ALL
+
+
 @dataclass(frozen=True)
 class DefaultedResult:
     """Variant of :class:`Result` where attributes are set
@@ -114,6 +149,8 @@ class DefaultedResult:
     ``"Other"`` and every other attribute set to ``None``.
     """
 
+    __slots__ = ("device", "os", "string", "user_agent")
+    __reduce__ = _reduce
     user_agent: UserAgent
     os: OS
     device: Device
@@ -130,6 +167,8 @@ class Result:
 
     """
 
+    __slots__ = ("device", "os", "string", "user_agent")
+    __reduce__ = _reduce
     user_agent: Optional[UserAgent]
     os: Optional[OS]
     device: Optional[Device]
@@ -145,10 +184,10 @@ class Result:
         """
 
         return DefaultedResult(
-            user_agent=self.user_agent or UserAgent(),
-            os=self.os or OS(),
-            device=self.device or Device(),
-            string=self.string,
+            self.user_agent or _DEFAULT_USER_AGENT,
+            self.os or _DEFAULT_OS,
+            self.device or _DEFAULT_DEVICE,
+            self.string,
         )
 
 
@@ -173,6 +212,7 @@ class PartialResult:
     """
 
     __slots__ = ("device", "domains", "os", "string", "user_agent")
+    __reduce__ = _reduce
     domains: Domain
     user_agent: Optional[UserAgent]
     os: Optional[OS]
@@ -185,15 +225,10 @@ class PartialResult:
 
         :raises ValueError: if the result is not fully resolved
         """
-        if self.domains != Domain.ALL:
+        if self.domains is not _ALL:
             raise ValueError("Only a result with all attributes set can be completed")
 
-        return Result(
-            user_agent=self.user_agent,
-            os=self.os,
-            device=self.device,
-            string=self.string,
-        )
+        return Result(self.user_agent, self.os, self.device, self.string)
 
 
 class Resolver(Protocol):
@@ -231,8 +266,14 @@ class Matcher(abc.ABC, Generic[T]):
 
     Matchers need to expose their pattern for bulk resolvers.
 
+    The builtin matchers compile their pattern with :data:`re.ASCII`:
+    shorthand classes (digits, word characters, whitespace) and case
+    folding only cover ASCII, as they do in re2.
+
     """
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def __call__(self, ua: str) -> Optional[T]:
         """Applies the matcher to an input."""
@@ -0,0 +1,158 @@
+__all__ = ["Resolver"]
+
+import re
+import threading
+from typing import Any, Generic, List, Optional, TypeVar, cast
+
+import hyperscan  # type: ignore
+
+from .core import (
+    Device,
+    Domain,
+    Matcher,
+    Matchers,
+    OS,
+    PartialResult,
+    UserAgent,
+)
+from .utils import fa_simplifier
+
+T = TypeVar("T")
+_ALL = Domain.ALL
+_UA = Domain.USER_AGENT
+_OS = Domain.OS
+_DEV = Domain.DEVICE
+
+FLAGS = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+
+# hyperscan rejects start anchors anywhere but at the start of the
+# pattern, since we're only prefiltering removing them is fine
+EMBEDDED_ANCHOR = re.compile(
+    r"""
+\\.
+|
+\[\^?\]?(?:\\.|[^]\\])*\]
+|
+(?<!^)\^
+""",
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def _prepare(pattern: str) -> bytes:
+    pattern = EMBEDDED_ANCHOR.sub(lambda m: "" if m[0] == "^" else m[0], pattern)
+    return fa_simplifier(pattern).encode()
+
+
+def _on_match(
+    id: int, _from: int, _to: int, _flags: int, context: object
+) -> Optional[bool]:
+    cast(List[int], context).append(id)
+    return None
+
+
+class Filter(Generic[T]):
+    """Compiles the regexes of a set of matchers into a hyperscan
+    database in prefilter mode, which yields a superset of the
+    matching regexes in a single pass over the input. The candidates
+    are then confirmed in order by the matchers themselves.
+
+    Patterns hyperscan rejects even in prefilter mode are always
+    checked. User agents which are not ascii are checked against every
+    matcher, as unicode semantics are not guaranteed to line up.
+    """
+
+    def __init__(self, matchers: List[Matcher[T]]) -> None:
+        self.matchers = matchers
+        self.always: List[int] = []
+        self.local = threading.local()
+
+        expressions = [_prepare(m.regex) for m in matchers]
+        flags = [
+            FLAGS | hyperscan.HS_FLAG_CASELESS if m.flags & re.IGNORECASE else FLAGS
+            for m in matchers
+        ]
+        ids = list(range(len(matchers)))
+        self.db: Optional[hyperscan.Database] = None
+        if not ids:
+            return
+
+        try:
+            self.db = _compile(expressions, ids, flags)
+        except hyperscan.error:
+            # bisect to find the culprits, then build the database
+            # without them
+            def bisect(ids: List[int]) -> None:
+                try:
+                    _compile(
+                        [expressions[i] for i in ids], ids, [flags[i] for i in ids]
+                    )
+                except hyperscan.error:
+                    if len(ids) == 1:
+                        self.always.extend(ids)
+                    else:
+                        bisect(ids[: len(ids) // 2])
+                        bisect(ids[len(ids) // 2 :])
+
+            bisect(ids)
+            ids = [i for i in ids if i not in self.always]
+            if ids:
+                self.db = _compile(
+                    [expressions[i] for i in ids], ids, [flags[i] for i in ids]
+                )
+
+    def __call__(self, ua: str) -> Optional[T]:
+        candidates: Any
+        if self.db is None:
+            candidates = self.always
+        elif ua.isascii():
+            if (scratch := getattr(self.local, "scratch", None)) is None:
+                scratch = self.local.scratch = hyperscan.Scratch(self.db)
+            candidates = []
+            self.db.scan(ua.encode(), _on_match, context=candidates, scratch=scratch)
+            if self.always:
+                candidates.extend(self.always)
+            candidates.sort()
+        else:
+            candidates = range(len(self.matchers))
+
+        matchers = self.matchers
+        for i in candidates:
+            r: Optional[T] = matchers[i](ua)
+            if r:
+                return r
+        return None
+
+
+def _compile(
+    expressions: List[bytes], ids: List[int], flags: List[int]
+) -> hyperscan.Database:
+    db = hyperscan.Database()
+    db.compile(expressions=expressions, ids=ids, elements=len(ids), flags=flags)
+    return db
+
+
+class Resolver:
+    """A resolver using `hyperscan <https://www.hyperscan.io>`_ to
+    find the candidate matchers for a user agent in a single pass.
+    """
+
+    user_agent: Filter[UserAgent]
+    os: Filter[OS]
+    device: Filter[Device]
+
+    def __init__(self, matchers: Matchers) -> None:
+        ua, os, dev = matchers
+        self.user_agent = Filter(ua)
+        self.os = Filter(os)
+        self.device = Filter(dev)
+
+    def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
+        every = domains is _ALL
+        return PartialResult(
+            domains=domains,
+            string=ua,
+            user_agent=self.user_agent(ua) if every or _UA in domains else None,
+            os=self.os(ua) if every or _OS in domains else None,
+            device=self.device(ua) if every or _DEV in domains else None,
+        )
@@ -1,11 +1,10 @@
 __all__ = ["DeviceMatcher", "OSMatcher", "UserAgentMatcher"]
 
 import re
-from functools import cached_property
 from typing import Literal, Optional, Pattern
 
 from .core import Device, Matcher, OS, UserAgent
-from .utils import get, replacer
+from .utils import replacer
 
 
 class UserAgentMatcher(Matcher[UserAgent]):
@@ -17,12 +16,22 @@ class UserAgentMatcher(Matcher[UserAgent]):
 
     """
 
-    regex: str = ""
+    __slots__ = (
+        "_pattern",
+        "family",
+        "major",
+        "minor",
+        "patch",
+        "patch_minor",
+        "regex",
+    )
+    regex: str
     family: str
     major: Optional[str]
     minor: Optional[str]
     patch: Optional[str]
     patch_minor: Optional[str]
+    _pattern: Optional[Pattern[str]]
 
     def __init__(
         self,
@@ -34,6 +43,7 @@ class UserAgentMatcher(Matcher[UserAgent]):
         patch_minor: Optional[str] = None,
     ) -> None:
         self.regex = regex
+        self._pattern = None
         self.family = family or "$1"
         self.major = major
         self.minor = minor
@@ -41,23 +51,28 @@ class UserAgentMatcher(Matcher[UserAgent]):
         self.patch_minor = patch_minor
 
     def __call__(self, ua: str) -> Optional[UserAgent]:
-        if m := self.pattern.search(ua):
+        if m := (self._pattern or self._compile()).search(ua):
+            n = m.re.groups
             return UserAgent(
                 family=(
                     self.family.replace("$1", m[1])
                     if "$1" in self.family
                     else self.family
                 ),
-                major=self.major or get(m, 2),
-                minor=self.minor or get(m, 3),
-                patch=self.patch or get(m, 4),
-                patch_minor=self.patch_minor or get(m, 5),
+                major=self.major or ((m[2] or None) if n >= 2 else None),
+                minor=self.minor or ((m[3] or None) if n >= 3 else None),
+                patch=self.patch or ((m[4] or None) if n >= 4 else None),
+                patch_minor=self.patch_minor or ((m[5] or None) if n >= 5 else None),
             )
         return None
 
-    @cached_property
+    @property
     def pattern(self) -> Pattern[str]:
-        return re.compile(self.regex)
+        return self._pattern or self._compile()
+
+    def _compile(self) -> Pattern[str]:
+        self._pattern = p = re.compile(self.regex, re.ASCII)
+        return p
 
     def __repr__(self) -> str:
         fields = [
@@ -81,12 +96,22 @@ class OSMatcher(Matcher[OS]):
 
     """
 
-    regex: str = ""
+    __slots__ = (
+        "_pattern",
+        "family",
+        "major",
+        "minor",
+        "patch",
+        "patch_minor",
+        "regex",
+    )
+    regex: str
     family: str
     major: str
     minor: str
     patch: str
     patch_minor: str
+    _pattern: Optional[Pattern[str]]
 
     def __init__(
         self,
@@ -98,6 +123,7 @@ class OSMatcher(Matcher[OS]):
         patch_minor: Optional[str] = None,
     ) -> None:
         self.regex = regex
+        self._pattern = None
         self.family = family or "$1"
         self.major = major or "$2"
         self.minor = minor or "$3"
@@ -105,7 +131,7 @@ class OSMatcher(Matcher[OS]):
         self.patch_minor = patch_minor or "$5"
 
     def __call__(self, ua: str) -> Optional[OS]:
-        if m := self.pattern.search(ua):
+        if m := (self._pattern or self._compile()).search(ua):
             family = replacer(self.family, m)
             if family is None:
                 raise ValueError(f"Unable to find OS family in {ua}")
@@ -118,9 +144,13 @@ class OSMatcher(Matcher[OS]):
             )
         return None
 
-    @cached_property
+    @property
     def pattern(self) -> Pattern[str]:
-        return re.compile(self.regex)
+        return self._pattern or self._compile()
+
+    def _compile(self) -> Pattern[str]:
+        self._pattern = p = re.compile(self.regex, re.ASCII)
+        return p
 
     def __repr__(self) -> str:
         fields = [
@@ -144,11 +174,13 @@ class DeviceMatcher(Matcher[Device]):
 
     """
 
-    regex: str = ""
-    regex_flag: Optional[Literal["i"]] = None
+    __slots__ = ("_pattern", "brand", "family", "model", "regex", "regex_flag")
+    regex: str
+    regex_flag: Optional[Literal["i"]]
     family: str
     brand: str
     model: str
+    _pattern: Optional[Pattern[str]]
 
     def __init__(
         self,
@@ -159,13 +191,14 @@ class DeviceMatcher(Matcher[Device]):
         model: Optional[str] = None,
     ) -> None:
         self.regex = regex
+        self._pattern = None
         self.regex_flag = regex_flag
         self.family = family or "$1"
         self.brand = brand or ""
         self.model = model or "$1"
 
     def __call__(self, ua: str) -> Optional[Device]:
-        if m := self.pattern.search(ua):
+        if m := (self._pattern or self._compile()).search(ua):
             family = replacer(self.family, m)
             if family is None:
                 raise ValueError(f"Unable to find device family in {ua}")
@@ -180,9 +213,13 @@ class DeviceMatcher(Matcher[Device]):
     def flags(self) -> int:
         return re.IGNORECASE if self.regex_flag == "i" else 0
 
-    @cached_property
+    @property
     def pattern(self) -> Pattern[str]:
-        return re.compile(self.regex, flags=self.flags)
+        return self._pattern or self._compile()
+
+    def _compile(self) -> Pattern[str]:
+        self._pattern = p = re.compile(self.regex, flags=self.flags | re.ASCII)
+        return p
 
     def __repr__(self) -> str:
         fields = [
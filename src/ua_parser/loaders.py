@@ -196,7 +196,9 @@ def load_json(f: PathOrFile, loader: DataLoader = load_data) -> Matchers:
 
     """
     if isinstance(f, (str, os.PathLike)):
-        with open(f) as fp:
+        # binary mode lets the parser handle the decoding, which is
+        # faster and doesn't depend on the locale
+        with open(f, "rb") as fp:
             regexes = json.load(fp)
     else:
         regexes = json.load(f)
@@ -224,7 +226,9 @@ else:
         instead.
         """
         if isinstance(path, (str, os.PathLike)):
-            with open(path) as fp:
+            # binary mode lets the parser handle the decoding, which is
+            # faster and doesn't depend on the locale
+            with open(path, "rb") as fp:
                 regexes = load(fp, Loader=SafeLoader)  # type: ignore
         else:
             regexes = load(path, Loader=SafeLoader)  # type: ignore
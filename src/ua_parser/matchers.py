@@ -1,10 +1,12 @@
 __all__ = ["DeviceMatcher", "OSMatcher", "UserAgentMatcher"]
 
 import re
-from typing import Literal, Optional, Pattern
+import sys
+from itertools import repeat
+from typing import Any, List, Literal, Optional, Pattern, Tuple
 
 from .core import Device, Matcher, OS, UserAgent
-from .utils import get, replacer
+from .utils import Template, compile_template
 
 
 class UserAgentMatcher(Matcher[UserAgent]):
@@ -13,12 +15,26 @@ class UserAgentMatcher(Matcher[UserAgent]):
 
     """
 
+    __slots__ = (
+        "_family",
+        "_family_parts",
+        "_groups",
+        "family",
+        "major",
+        "minor",
+        "patch",
+        "patch_minor",
+        "pattern",
+    )
     pattern: Pattern[str]
     family: str
     major: Optional[str]
     minor: Optional[str]
     patch: Optional[str]
     patch_minor: Optional[str]
+    _groups: int
+    _family: Optional[str]
+    _family_parts: List[str]
 
     def __init__(
         self,
@@ -29,25 +45,27 @@ class UserAgentMatcher(Matcher[UserAgent]):
         patch: Optional[str] = None,
         patch_minor: Optional[str] = None,
     ) -> None:
-        self.pattern = re.compile(regex)
+        self.pattern = re.compile(regex, re.ASCII)
         self.family = family or "$1"
         self.major = major
         self.minor = minor
         self.patch = patch
         self.patch_minor = patch_minor
+        self._groups = self.pattern.groups
+        # a static family is returned as-is, otherwise the first group
+        # is joined around the pieces between ``$1`` placeholders
+        self._family = sys.intern(self.family) if "$1" not in self.family else None
+        self._family_parts = self.family.split("$1")
 
     def __call__(self, ua: str) -> Optional[UserAgent]:
         if m := self.pattern.search(ua):
+            n = self._groups
             return UserAgent(
-                family=(
-                    self.family.replace("$1", m[1])
-                    if "$1" in self.family
-                    else self.family
-                ),
-                major=self.major or get(m, 2),
-                minor=self.minor or get(m, 3),
-                patch=self.patch or get(m, 4),
-                patch_minor=self.patch_minor or get(m, 5),
+                self._family or m[1].join(self._family_parts),
+                self.major or ((m[2] or None) if n >= 2 else None),
+                self.minor or ((m[3] or None) if n >= 3 else None),
+                self.patch or ((m[4] or None) if n >= 4 else None),
+                self.patch_minor or ((m[5] or None) if n >= 5 else None),
             )
         return None
 
@@ -74,12 +92,22 @@ class OSMatcher(Matcher[OS]):
 
     """
 
+    __slots__ = (
+        "_templates",
+        "family",
+        "major",
+        "minor",
+        "patch",
+        "patch_minor",
+        "pattern",
+    )
     pattern: Pattern[str]
     family: str
     major: str
     minor: str
     patch: str
     patch_minor: str
+    _templates: Tuple[Template, ...]
 
     def __init__(
         self,
@@ -90,25 +118,26 @@ class OSMatcher(Matcher[OS]):
         patch: Optional[str] = None,
         patch_minor: Optional[str] = None,
     ) -> None:
-        self.pattern = re.compile(regex)
+        self.pattern = re.compile(regex, re.ASCII)
         self.family = family or "$1"
         self.major = major or "$2"
         self.minor = minor or "$3"
         self.patch = patch or "$4"
         self.patch_minor = patch_minor or "$5"
+        self._templates = tuple(
+            map(
+                compile_template,
+                (self.family, self.major, self.minor, self.patch, self.patch_minor),
+                repeat(self.pattern.groups),
+            )
+        )
 
     def __call__(self, ua: str) -> Optional[OS]:
         if m := self.pattern.search(ua):
-            family = replacer(self.family, m)
-            if family is None:
+            family, major, minor, patch, patch_minor = self._templates
+            if (f := family(m)) is None:
                 raise ValueError(f"Unable to find OS family in {ua}")
-            return OS(
-                family=family,
-                major=replacer(self.major, m),
-                minor=replacer(self.minor, m),
-                patch=replacer(self.patch, m),
-                patch_minor=replacer(self.patch_minor, m),
-            )
+            return OS(f, major(m), minor(m), patch(m), patch_minor(m))
         return None
 
     @property
@@ -127,6 +156,20 @@ class OSMatcher(Matcher[OS]):
 
         return f"OSMatcher({self.regex!r}{args})"
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # compiled templates can't be pickled, rebuild from the source
+        return (
+            OSMatcher,
+            (
+                self.regex,
+                self.family,
+                self.major,
+                self.minor,
+                self.patch,
+                self.patch_minor,
+            ),
+        )
+
 
 class DeviceMatcher(Matcher[Device]):
     """Eager device matcher, compiles the input ``regex`` at
@@ -134,10 +177,12 @@ class DeviceMatcher(Matcher[Device]):
 
     """
 
+    __slots__ = ("_templates", "brand", "family", "model", "pattern")
     pattern: Pattern[str]
     family: str
     brand: str
     model: str
+    _templates: Tuple[Template, ...]
 
     def __init__(
         self,
@@ -148,22 +193,25 @@ class DeviceMatcher(Matcher[Device]):
         model: Optional[str] = None,
     ) -> None:
         self.pattern = re.compile(
-            regex, flags=re.IGNORECASE if regex_flag == "i" else 0
+            regex, flags=re.IGNORECASE | re.ASCII if regex_flag == "i" else re.ASCII
         )
         self.family = family or "$1"
         self.brand = brand or ""
         self.model = model or "$1"
+        self._templates = tuple(
+            map(
+                compile_template,
+                (self.family, self.brand, self.model),
+                repeat(self.pattern.groups),
+            )
+        )
 
     def __call__(self, ua: str) -> Optional[Device]:
         if m := self.pattern.search(ua):
-            family = replacer(self.family, m)
-            if family is None:
+            family, brand, model = self._templates
+            if (f := family(m)) is None:
                 raise ValueError(f"Unable to find device family in {ua}")
-            return Device(
-                family=family,
-                brand=replacer(self.brand, m),
-                model=replacer(self.model, m),
-            )
+            return Device(f, brand(m), model(m))
         return None
 
     @property
@@ -188,3 +236,10 @@ class DeviceMatcher(Matcher[Device]):
         args = iflag + "".join(f", {k}={v!r}" for k, v in fields if v is not None)
 
         return f"DeviceMatcher({self.regex!r}{args})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # compiled templates can't be pickled, rebuild from the source
+        return (
+            DeviceMatcher,
+            (self.regex, self.regex_flag, self.family, self.brand, self.model),
+        )
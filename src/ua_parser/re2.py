@@ -16,6 +16,11 @@ from .core import (
 )
 from .utils import fa_simplifier
 
+_ALL = Domain.ALL
+_UA = Domain.USER_AGENT
+_OS = Domain.OS
+_DEV = Domain.DEVICE
+
 
 class DummyFilter:
     def Match(self, _: str) -> None:
@@ -67,17 +72,18 @@ class Resolver:
             self.devices = DummyFilter()
 
     def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
+        every = domains is _ALL
         user_agent = os = device = None
-        if Domain.USER_AGENT in domains:
+        if every or _UA in domains:
             if matches := self.ua.Match(ua):
                 # Set/Filter does not return the match in index order
                 # (position order?) so to fit UAP semantics we need to
                 # extract the first matching regex (lowest index).
                 user_agent = self.user_agent_matchers[min(matches)](ua)
-        if Domain.OS in domains:
+        if every or _OS in domains:
             if matches := self.os.Match(ua):
                 os = self.os_matchers[min(matches)](ua)
-        if Domain.DEVICE in domains:
+        if every or _DEV in domains:
             if matches := self.devices.Match(ua):
                 device = self.device_matchers[min(matches)](ua)
         return PartialResult(
@@ -13,6 +13,11 @@ from .core import (
     UserAgent,
 )
 
+_ALL = Domain.ALL
+_UA = Domain.USER_AGENT
+_OS = Domain.OS
+_DEV = Domain.DEVICE
+
 
 class Resolver:
     ua: ua_parser_rs.UserAgentExtractor
@@ -41,8 +46,9 @@ class Resolver:
         )
 
     def __call__(self, ua: str, domains: Domain, /) -> PartialResult:
+        every = domains is _ALL
         user_agent = os = device = None
-        if Domain.USER_AGENT in domains:
+        if every or _UA in domains:
             if m := self.ua.extract(ua):
                 user_agent = UserAgent(
                     m.family,
@@ -51,7 +57,7 @@ class Resolver:
                     m.patch,
                     m.patch_minor,
                 )
-        if Domain.OS in domains:
+        if every or _OS in domains:
             if m := self.os.extract(ua):
                 os = OS(
                     m.family,
@@ -60,7 +66,7 @@ class Resolver:
                     m.patch,
                     m.patch_minor,
                 )
-        if Domain.DEVICE in domains:
+        if every or _DEV in domains:
             if m := self.de.extract(ua):
                 device = Device(
                     m.family,
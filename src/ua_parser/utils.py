@@ -1,6 +1,13 @@
+import functools
 import platform
 import re
-from typing import Match, Optional
+import sys
+from typing import Any, Callable, List, Match, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # pre-3.11
+    import sre_parse  # type: ignore
 
 IS_GRAAL: bool = platform.python_implementation() == "GraalVM"
 
@@ -9,6 +16,9 @@ def get(m: Match[str], idx: int) -> Optional[str]:
     return (m[idx] or None) if 0 < idx <= m.re.groups else None
 
 
+SUBSTITUTION_PATTERN = re.compile(r"\$(\d)")
+
+
 def replacer(repl: str, m: Match[str]) -> Optional[str]:
     """The replacement rules are frustratingly subtle and innimical to
     standard python fallback semantics:
@@ -26,11 +36,52 @@ def replacer(repl: str, m: Match[str]) -> Optional[str]:
     static replacement or it falls back to the corresponding
     (optional) match group.
 
+    """
+    return _compiled_template(repl)(m)
+
+
+Template = Callable[[Match[str]], Optional[str]]
+
+
+def compile_template(repl: str, groups: Optional[int] = None) -> Template:
+    """Compiles the replacement pattern ``repl`` to a function applying
+    it to a match, following the rules of :func:`replacer`.
+
+    The pattern is only parsed once, and common shapes (no
+    substitution, a single group) get a dedicated function. If the
+    number of ``groups`` of the regex the template applies to is
+    known, group references are resolved upfront.
     """
     if not repl:
-        return None
+        return lambda m: None
+
+    parts = SUBSTITUTION_PATTERN.split(repl)
+    if len(parts) == 1:
+        value = sys.intern(repl.strip()) or None
+        return lambda m: value
+
+    if len(parts) == 3 and not (parts[0] or parts[2]):
+        idx = int(parts[1])
+        if groups is None:
+            return lambda m: (get(m, idx) or "").strip() or None
+        if 0 < idx <= groups:
+            return lambda m: (m[idx] or "").strip() or None
+        return lambda m: None
+
+    literals = parts[::2]
+    indices = [int(i) for i in parts[1::2]]
+    head, tail = literals[0], literals[1:]
 
-    return re.sub(r"\$(\d)", lambda n: get(m, int(n[1])) or "", repl).strip() or None
+    def template(m: Match[str]) -> Optional[str]:
+        s = head
+        for i, literal in zip(indices, tail):
+            s += (get(m, i) or "") + literal
+        return s.strip() or None
+
+    return template
+
+
+_compiled_template = functools.lru_cache(maxsize=None)(compile_template)
 
 
 REPETITION_PATTERN = re.compile(r"\{(0|1)\s*,\s*\d{3,}\}")
@@ -61,3 +112,96 @@ def fa_simplifier(pattern: str) -> str:
     """
     pattern = REPETITION_PATTERN.sub(lambda m: "*" if m[1] == "0" else "+", pattern)
     return CLASS_PATTERN.sub(class_replacer, pattern)
+
+
+CAPTURE_PATTERN = re.compile(
+    r"""
+\\.
+|
+\[\^?\]?(?:\\.|[^]\\])*\]
+|
+\((?!\?)
+""",
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def strip_captures(pattern: str) -> str:
+    """Converts all capturing groups of ``pattern`` to non-capturing,
+    which makes ``re`` skip the bookkeeping of group boundaries when
+    we only need to know whether a pattern matches.
+
+    Patterns with backreferences may not compile afterwards.
+    """
+    return CAPTURE_PATTERN.sub(lambda m: "(?:" if m[0] == "(" else m[0], pattern)
+
+
+def extract_literals(pattern: str, flags: int = 0) -> Tuple[int, List[Tuple[str, ...]]]:
+    """Extracts the literals which *must* appear in any string matching
+    ``pattern``, as a list of alternatives: each entry is a tuple of
+    literals at least one of which has to be present.
+
+    Returns the effective flags of the pattern (including inline
+    flags) alongside the literals.
+
+    This is conservative, anything which is not a straight sequence
+    of literals (classes, optional repetitions, ...) is treated as a
+    break between literals. Alternations are supported as long as
+    every branch requires a literal.
+
+    If ``pattern`` is case-insensitive, the literals are returned
+    lowercased, and non-ascii characters are treated as breaks.
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    flags |= parsed.state.flags
+    icase = bool(flags & re.IGNORECASE)
+
+    def kept(item: Any) -> bool:
+        # non-ascii literals are dropped from case-insensitive patterns
+        op, arg = item
+        return op is sre_parse.LITERAL and not (icase and arg > 127)
+
+    def walk(items: Any) -> List[Tuple[str, ...]]:
+        factors: List[Tuple[str, ...]] = []
+        run: List[str] = []
+
+        def flush() -> None:
+            if run:
+                factors.append(("".join(run),))
+                run.clear()
+
+        for op, arg in items:
+            if kept((op, arg)):
+                run.append(chr(arg).lower() if icase else chr(arg))
+            elif op is sre_parse.SUBPATTERN and not (arg[1] or arg[2]):
+                # groups are transparent for the purpose of literals,
+                # but their content can't be merged into the current
+                # run unless it's just (kept) literals
+                sub = walk(arg[-1])
+                if len(sub) == 1 and all(map(kept, arg[-1])):
+                    run.append(sub[0][0])
+                else:
+                    flush()
+                    factors.extend(sub)
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] > 0:
+                flush()
+                factors.extend(walk(arg[2]))
+            elif op is sre_parse.BRANCH:
+                flush()
+                alternatives: List[str] = []
+                for branch in arg[1]:
+                    if not (sub := walk(branch)):
+                        break
+                    alternatives.extend(_longest(sub))
+                else:
+                    factors.append(tuple(alternatives))
+            elif op is not sre_parse.AT:
+                flush()
+        flush()
+        return factors
+
+    return flags, walk(parsed)
+
+
+def _longest(factors: List[Tuple[str, ...]]) -> Tuple[str, ...]:
+    return max(factors, key=lambda f: (min(map(len, f)), -len(f)))
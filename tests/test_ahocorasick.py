@@ -0,0 +1,39 @@
+import pytest  # type: ignore
+
+from ua_parser import Domain, PartialResult, UserAgent
+from ua_parser.matchers import UserAgentMatcher
+from ua_parser.utils import extract_literals
+
+ahocorasick = pytest.importorskip("ua_parser.ahocorasick")
+
+
+def test_empty(capfd: pytest.CaptureFixture[str]) -> None:
+    r = ahocorasick.Resolver(([], [], []))
+    assert r("", Domain.ALL) == PartialResult(Domain.ALL, None, None, None, "")
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert err == ""
+
+
+@pytest.mark.parametrize(
+    ("pattern", "flags", "literals"),
+    [
+        ("(Foo)Bar[ /](\\d+)", 0, [("FooBar",)]),
+        ("^Foo.*Bar", 0, [("Foo",), ("Bar",)]),
+        ("(Foo|Quux)(?:Bar|)", 0, [("Foo", "Quux")]),
+        ("(Foo|[a-z]+)Bar", 0, [("Bar",)]),
+        ("Foo(?:Bar)?", 0, [("Foo",)]),
+        ("(?:Foo)+Bar", 0, [("Foo",), ("Bar",)]),
+        ("FooBar", 2, [("foobar",)]),
+        ("(?i)FooBar", 0, [("foobar",)]),
+        ("FoöBar", 2, [("fo",), ("bar",)]),
+        ("x(éab)", 2, [("x",), ("ab",)]),
+    ],
+)
+def test_extract_literals(pattern, flags, literals):
+    assert extract_literals(pattern, flags)[1] == literals
+
+
+def test_inline_icase():
+    r = ahocorasick.Resolver(([UserAgentMatcher("(?i)(Foo)Bar")], [], []))
+    assert r("FOOBAR", Domain.USER_AGENT).user_agent == UserAgent("FOO")
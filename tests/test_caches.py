@@ -1,3 +1,4 @@
+import threading
 from collections import OrderedDict
 
 import pytest  # type: ignore
@@ -5,10 +6,12 @@ import pytest  # type: ignore
 from ua_parser import (
     CachingResolver,
     Domain,
+    OS,
     Parser,
     PartialResult,
+    UserAgent,
 )
-from ua_parser.caching import Lru, S3Fifo, Sieve
+from ua_parser.caching import BatchCache, Local, Lru, S3Fifo, Sieve
 
 
 def test_lru():
@@ -73,3 +76,102 @@ def test_backfill(cache):
     for s in map(str, range(9)):
         p.parse(s)
     assert misses == 0
+
+
+@pytest.mark.parametrize("cache", [Lru, S3Fifo, Sieve])
+def test_resolve_many(cache):
+    """Tests that batch resolution only resolves each missing user
+    agent once, and stores the results in the cache.
+    """
+    misses = []
+
+    def resolver(ua: str, domains: Domain, /) -> PartialResult:
+        misses.append(ua)
+        return PartialResult(domains, None, None, None, ua)
+
+    c = cache(10)
+    assert isinstance(c, BatchCache)
+    r = CachingResolver(resolver, c)
+    r("a", Domain.ALL)
+    results = r.resolve_many(["a", "b", "c", "b"], Domain.ALL)
+    assert [p.string for p in results] == ["a", "b", "c", "b"]
+    assert misses == ["a", "b", "c"]
+
+    assert [p.string for p in Parser(r).parse_many(["c", "b", "a"])] == [
+        "c",
+        "b",
+        "a",
+    ]
+    assert misses == ["a", "b", "c"]
+
+
+def test_local():
+    """Tests that each thread gets its own cache."""
+    caches = []
+
+    def factory():
+        caches.append(Lru(10))
+        return caches[-1]
+
+    cache = Local(factory)
+    r = PartialResult(Domain.ALL, None, None, None, "a")
+    cache["a"] = r
+    assert cache["a"] is r
+
+    t = threading.Thread(target=lambda: cache.__setitem__("b", r))
+    t.start()
+    t.join()
+
+    assert len(caches) == 2
+    assert cache["b"] is None
+    assert caches[1]["b"] is r
+
+
+def test_interning():
+    """Tests that equal values are shared between cache entries."""
+    cache = Lru(10)
+    r = CachingResolver(
+        lambda s, d: PartialResult(d, UserAgent("a", "1"), OS("b"), None, s), cache
+    )
+
+    a = r("x", Domain.ALL)
+    b = r("y", Domain.ALL)
+    assert a.user_agent == b.user_agent == UserAgent("a", "1")
+    assert a.user_agent is b.user_agent
+    assert a.os is b.os
+    assert cache["y"] is b
+
+
+def test_merge_unresolved():
+    """Tests that fields outside of an entry's domains are not merged in,
+    whatever their value.
+    """
+
+    def resolver(ua: str, domains: Domain, /) -> PartialResult:
+        return PartialResult(
+            domains,
+            UserAgent("a") if Domain.USER_AGENT in domains else UserAgent("bogus"),
+            OS("b") if Domain.OS in domains else None,
+            None,
+            ua,
+        )
+
+    r = CachingResolver(resolver, Lru(10))
+    r("x", Domain.OS)
+    assert r("x", Domain.ALL) == PartialResult(
+        Domain.ALL, UserAgent("a"), OS("b"), None, "x"
+    )
+
+
+def test_interning_subclass():
+    """Tests that subclasses of the domain classes are cached as-is."""
+
+    class U(UserAgent):
+        __slots__ = ()
+
+    cache = Lru(10)
+    r = CachingResolver(lambda s, d: PartialResult(d, U("x"), None, None, s), cache)
+
+    a = r("a", Domain.ALL)
+    assert type(a.user_agent) is U
+    assert cache["a"] is a
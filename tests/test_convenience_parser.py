@@ -1,5 +1,10 @@
+import gc
+import weakref
+
+import pytest  # type: ignore
+
 import ua_parser
-from ua_parser import Domain, Parser, PartialResult, Result
+from ua_parser import Cache, CachingResolver, Domain, OS, Parser, PartialResult, Result
 
 
 def test_parser_memoized() -> None:
@@ -34,3 +39,97 @@ def test_parser_utility() -> None:
 
     os = Parser.parse_os(resolver, "a")
     assert os is None
+
+    rs = Parser.parse_many(resolver, ["a", "b"])
+    assert list(rs) == [Result(None, None, None, "a"), Result(None, None, None, "b")]
+
+
+def test_global_parser_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The global helpers should pick up a customised global parser,
+    and re-initialise the default one if it's removed.
+    """
+    p = Parser(resolver)
+    monkeypatch.setattr(ua_parser, "parser", p)
+    assert ua_parser.parse("a") == Result(None, None, None, "a")
+    assert ua_parser.parse_os("a") is None
+    assert list(ua_parser.parse_many(["a"])) == [Result(None, None, None, "a")]
+
+    monkeypatch.delattr(ua_parser, "parser")
+    assert ua_parser.parse_os("Mozilla/5.0 (Windows NT 10.0; Win64; x64)") == OS(
+        "Windows", "10"
+    )
+    assert ua_parser.parser is not p
+
+
+def test_fork_resets_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Forked children should start with an empty cache."""
+    cache = Cache(10)
+    p = Parser(CachingResolver(resolver, cache))
+    monkeypatch.setattr(ua_parser, "parser", p)
+    monkeypatch.setattr(ua_parser, "_default_parser", weakref.ref(p))
+    ua_parser.parse("a")
+
+    ua_parser._after_fork_in_child()
+    r = ua_parser.parser.resolver
+    assert isinstance(r, CachingResolver)
+    new_cache = r.cache
+    assert new_cache is not cache
+    assert isinstance(new_cache, Cache)
+    assert new_cache.maxsize == 10
+    assert new_cache["a"] is None
+
+
+def test_fork_keeps_user_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A parser set by the user should keep its cache across forks."""
+    cache = Cache(10)
+    monkeypatch.setattr(ua_parser, "parser", Parser(CachingResolver(resolver, cache)))
+    ua_parser.parse("a")
+
+    ua_parser._after_fork_in_child()
+    r = ua_parser.parser.resolver
+    assert isinstance(r, CachingResolver)
+    assert r.cache is cache
+    assert cache["a"] is not None
+
+
+def test_helpers_fast_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Once the global parser is set, the helpers should access it
+    directly rather than go through the module's ``__getattr__``.
+    """
+
+    def fail(name: str) -> None:
+        raise AssertionError(f"unexpected lookup of {name!r}")
+
+    monkeypatch.setattr(ua_parser, "parser", Parser(resolver))
+    monkeypatch.setattr(ua_parser, "__getattr__", fail)
+    assert ua_parser.parse("b") == Result(None, None, None, "b")
+    assert ua_parser.parse_user_agent("b") is None
+    assert ua_parser.parse_os("b") is None
+    assert ua_parser.parse_device("b") is None
+    assert list(ua_parser.parse_many(["b"])) == [Result(None, None, None, "b")]
+
+
+def test_replaced_parser_collected() -> None:
+    """The helpers' memoization should not keep a replaced default
+    parser alive, nor apply to a parser set by the user.
+    """
+    vars(ua_parser).pop("parser", None)
+    ua_parser.parse("a")
+    ref = weakref.ref(ua_parser.parser)
+
+    calls = []
+
+    def counting(s: str, d: Domain) -> PartialResult:
+        calls.append(s)
+        return resolver(s, d)
+
+    ua_parser.parser = Parser(counting)
+    try:
+        gc.collect()
+        assert ref() is None
+
+        assert ua_parser.parse("a") == Result(None, None, None, "a")
+        assert ua_parser.parse("a") == Result(None, None, None, "a")
+        assert calls == ["a", "a"]
+    finally:
+        del ua_parser.parser
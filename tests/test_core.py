@@ -57,6 +57,32 @@ except ImportError:
 else:
     PARSERS.append(pytest.param(Parser(re2.Resolver(data)), id="re2"))
 
+try:
+    from ua_parser import hyperscan
+except ImportError:
+    PARSERS.append(
+        pytest.param(
+            None,
+            id="hyperscan",
+            marks=pytest.mark.skip(reason="hyperscan parser not available"),
+        )
+    )
+else:
+    PARSERS.append(pytest.param(Parser(hyperscan.Resolver(data)), id="hyperscan"))
+
+try:
+    from ua_parser import ahocorasick
+except ImportError:
+    PARSERS.append(
+        pytest.param(
+            None,
+            id="ahocorasick",
+            marks=pytest.mark.skip(reason="ahocorasick parser not available"),
+        )
+    )
+else:
+    PARSERS.append(pytest.param(Parser(ahocorasick.Resolver(data)), id="ahocorasick"))
+
 try:
     from ua_parser import regex
 except ImportError:
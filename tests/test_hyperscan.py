@@ -0,0 +1,30 @@
+import pytest  # type: ignore
+
+from ua_parser import Domain, PartialResult, UserAgent
+from ua_parser.matchers import UserAgentMatcher
+
+hyperscan = pytest.importorskip("ua_parser.hyperscan")
+
+
+def test_empty(capfd: pytest.CaptureFixture[str]) -> None:
+    r = hyperscan.Resolver(([], [], []))
+    assert r("", Domain.ALL) == PartialResult(Domain.ALL, None, None, None, "")
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert err == ""
+
+
+def test_prefilter() -> None:
+    r = hyperscan.Resolver(
+        (
+            [UserAgentMatcher(r"(?:x|^a)(b)"), UserAgentMatcher("(b)", "other")],
+            [],
+            [],
+        )
+    )
+    assert r("ab", Domain.USER_AGENT).user_agent == UserAgent("b")
+    assert r("zab", Domain.USER_AGENT).user_agent == UserAgent("other")
+    assert r("éab", Domain.USER_AGENT).user_agent == UserAgent("other")
+    assert r("ab\u00e9", Domain.USER_AGENT).user_agent == UserAgent("b")
+    assert r("xb", Domain.USER_AGENT).user_agent == UserAgent("b")
+    assert r("z", Domain.USER_AGENT).user_agent is None
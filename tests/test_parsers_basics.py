@@ -1,13 +1,21 @@
+import copy
 import io
+import pickle
+import re
+from typing import Optional
 
 from ua_parser import (
     BasicResolver,
+    Device,
     Domain,
+    OS,
     PartialResult,
+    Result,
     UserAgent,
 )
+from ua_parser.core import Matcher
 from ua_parser.loaders import load_yaml
-from ua_parser.matchers import UserAgentMatcher
+from ua_parser.matchers import DeviceMatcher, OSMatcher, UserAgentMatcher
 
 
 def test_trivial_matching():
@@ -77,3 +85,112 @@ device_parsers: []
         os=None,
         device=None,
     )
+
+
+def test_backreferences():
+    """Patterns whose groups can't be stripped for scanning should
+    still work.
+    """
+    p = BasicResolver(([UserAgentMatcher(r"([()]a)\1")], [], []))
+
+    assert p("(a", Domain.USER_AGENT).user_agent is None
+    assert p("(a(a", Domain.USER_AGENT).user_agent == UserAgent("(a")
+
+
+def test_pickle_matchers():
+    matchers = (
+        [UserAgentMatcher("(a)/(\\d+)", "x $1")],
+        [OSMatcher("(b) (\\d+)", patch="1")],
+        [DeviceMatcher("(c)", "i", brand="$1 brand")],
+    )
+    p = BasicResolver(pickle.loads(pickle.dumps(matchers)))
+
+    assert p("a/1 b 2 C", Domain.ALL) == PartialResult(
+        string="a/1 b 2 C",
+        domains=Domain.ALL,
+        user_agent=UserAgent("x a", "1"),
+        os=OS("b", "2", patch="1"),
+        device=Device("C", "C brand", "C"),
+    )
+
+
+def test_ascii_semantics():
+    """Shorthand classes and case folding only cover ASCII."""
+    p = BasicResolver(
+        (
+            [UserAgentMatcher(r"(Android) (\d+)")],
+            [OSMatcher(r"(Android)\s(\d+)")],
+            [DeviceMatcher(r"(samsung) (\w+)", "i")],
+        )
+    )
+
+    assert p("Android 12 SAMSUNG SM", Domain.ALL) == PartialResult(
+        string="Android 12 SAMSUNG SM",
+        domains=Domain.ALL,
+        user_agent=UserAgent("Android", "12"),
+        os=OS("Android", "12"),
+        device=Device("SAMSUNG", None, "SAMSUNG"),
+    )
+    assert p("Android ١٢", Domain.ALL).user_agent is None
+    assert p("Android\u200912", Domain.ALL).os is None
+    assert p("\u017famsung SM", Domain.ALL).device is None
+    assert p("samsung \uff33\uff2d", Domain.ALL).device is None
+
+
+def test_copy_pickle_results():
+    ua = UserAgent("a", "1")
+    os = OS("b", "2", patch="1")
+    device = Device("c", "c brand", "c")
+    values = [
+        ua,
+        os,
+        device,
+        PartialResult(Domain.USER_AGENT, ua, None, None, "x"),
+        Result(ua, os, device, "x"),
+        Result(None, None, None, "x"),
+        Result(None, None, None, "x").with_defaults(),
+    ]
+    for v in values:
+        assert copy.copy(v) == v
+        assert copy.deepcopy(v) == v
+        assert pickle.loads(pickle.dumps(v)) == v
+
+
+class Picky(Matcher[UserAgent]):
+    """Matches its pattern, but only accepts the user agents starting
+    with ``prefix``.
+    """
+
+    def __init__(self, regex: str, prefix: str, flags: int = 0) -> None:
+        self._regex = regex
+        self._flags = flags
+        self.prefix = prefix
+
+    def __call__(self, ua: str) -> Optional[UserAgent]:
+        if ua.startswith(self.prefix) and re.search(self._regex, ua, self._flags):
+            return UserAgent(self.prefix)
+        return None
+
+    @property
+    def regex(self) -> str:
+        return self._regex
+
+    @property
+    def flags(self) -> int:
+        return self._flags
+
+
+def test_rejected_candidate():
+    """A matcher rejecting a candidate should not stop the scan."""
+    p = BasicResolver(([Picky("a", "x"), Picky("a", "y")], [], []))
+
+    assert p("ya", Domain.USER_AGENT).user_agent == UserAgent("y")
+    assert p("za", Domain.USER_AGENT).user_agent is None
+
+
+def test_unicode_matchers():
+    """Matchers may explicitly request unicode semantics."""
+    p = BasicResolver(([Picky(r"\d", "x", re.UNICODE), Picky(r"(?u)\s", "y")], [], []))
+
+    assert p("x\u0662", Domain.USER_AGENT).user_agent == UserAgent("x")
+    assert p("y\u2009", Domain.USER_AGENT).user_agent == UserAgent("y")